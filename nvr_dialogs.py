@@ -1,31 +1,133 @@
 # NVR Management Dialogs for CameraMonitor
 import os
+import socket
+import threading
+from functools import lru_cache
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
-import requests
-from requests.auth import HTTPBasicAuth, HTTPDigestAuth
-import threading
-import ipaddress
+
+# Deletes every character allowed in a dotted-quad IPv4 address
+_IPV4_CHARS = str.maketrans('', '', '0123456789.')
+
+@lru_cache(maxsize=256)
+def _is_valid_ip(address):
+    """Check for a valid IPv4 or IPv6 address (cached per string)"""
+    # Cheap shape check first so obvious garbage never reaches the parsers.
+    # inet_pton is stricter than inet_aton ("10.1" or "1" are rejected),
+    # which keeps the same acceptance rules as ipaddress.ip_address
+    if not address.translate(_IPV4_CHARS) and address.count('.') == 3:
+        family = socket.AF_INET
+    elif ':' in address:
+        family = socket.AF_INET6
+    else:
+        return False
+    try:
+        socket.inet_pton(family, address)
+        return True
+    except OSError:
+        return False
+
+def _is_valid_port(port):
+    """Check for a TCP port number in 1-65535 without exception handling"""
+    # isascii() keeps out non-ASCII digits such as "²" that isdigit() allows
+    return port.isascii() and port.isdigit() and 1 <= int(port) <= 65535
+
+class _TestConnectionSignals(QObject):
+    """Signals for _TestConnectionTask (QRunnable is not a QObject)"""
+    done = pyqtSignal(bool, str)
+
+class _TestConnectionTask(QRunnable):
+    """Runs a connection test on the global thread pool"""
+    def __init__(self, test_fn, *args):
+        super().__init__()
+        self.test_fn = test_fn
+        self.args = args
+        self.signals = _TestConnectionSignals()
+
+    def run(self):
+        success, message = self.test_fn(*self.args)
+        self.signals.done.emit(success, message)
 
 class AddNVRDialog(QDialog):
     """Dialog for adding new NVR with credentials"""
+
+    # Sessions shared across dialog instances, keyed by "protocol://ip:port",
+    # so repeated tests against the same NVR reuse the keep-alive connection.
+    # Only the most recently tested hosts are kept; older sessions are closed
+    # so their idle sockets do not stay open for the life of the process.
+    _session_cache = {}
+    _SESSION_CACHE_SIZE = 8
+    _session_lock = threading.Lock()
+
+    # Stylesheets are shared by every dialog instance
+    _TITLE_QSS = "font-size: 16px; font-weight: bold; color: #2c3e50; margin-bottom: 10px;"
+    _BTN_TEST_QSS = """
+        QPushButton {
+            background-color: #3498db;
+            color: white;
+            border: none;
+            padding: 8px;
+            border-radius: 4px;
+            font-weight: bold;
+        }
+        QPushButton:hover {
+            background-color: #2980b9;
+        }
+    """
+    _BTN_SAVE_QSS = """
+        QPushButton {
+            background-color: #27ae60;
+            color: white;
+            border: none;
+            padding: 8px 16px;
+            border-radius: 4px;
+            font-weight: bold;
+        }
+        QPushButton:hover {
+            background-color: #229954;
+        }
+    """
+    _BTN_CANCEL_QSS = """
+        QPushButton {
+            background-color: #e74c3c;
+            color: white;
+            border: none;
+            padding: 8px 16px;
+            border-radius: 4px;
+            font-weight: bold;
+        }
+        QPushButton:hover {
+            background-color: #c0392b;
+        }
+    """
+
+    # Window icon, resolved on first use (QIcon needs a QApplication)
+    _window_icon = None
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Add New NVR")
-        self.setWindowIcon(QIcon("nvr.ico") if os.path.exists("nvr.ico") else QIcon())
+        self.setWindowIcon(self._get_window_icon())
         self.setModal(True)
         self.setFixedSize(450, 350)
         self.setup_ui()
         
+    @classmethod
+    def _get_window_icon(cls):
+        """Load nvr.ico once per process instead of on every dialog open"""
+        if cls._window_icon is None:
+            cls._window_icon = QIcon("nvr.ico") if os.path.exists("nvr.ico") else QIcon()
+        return cls._window_icon
+        
     def setup_ui(self):
         layout = QVBoxLayout()
         
         # Title
-        title = QLabel("🗄️ Add New NVR Configuration")
-        title.setStyleSheet("font-size: 16px; font-weight: bold; color: #2c3e50; margin-bottom: 10px;")
-        title.setAlignment(Qt.AlignCenter)
-        layout.addWidget(title)
+        self.title_label = QLabel("🗄️ Add New NVR Configuration")
+        self.title_label.setStyleSheet(self._TITLE_QSS)
+        self.title_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.title_label)
         
         # Form layout
         form_layout = QFormLayout()
@@ -63,21 +165,17 @@ class AddNVRDialog(QDialog):
         
         layout.addLayout(form_layout)
         
+        # Live IP/port validation, debounced so it runs once per typing pause
+        self._validate_timer = QTimer(self)
+        self._validate_timer.setSingleShot(True)
+        self._validate_timer.setInterval(250)
+        self._validate_timer.timeout.connect(self._live_validate)
+        self.ip_edit.textChanged.connect(lambda _: self._validate_timer.start())
+        self.port_edit.textChanged.connect(lambda _: self._validate_timer.start())
+        
         # Test connection button
         self.test_btn = QPushButton("🔍 Test Connection")
-        self.test_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #3498db;
-                color: white;
-                border: none;
-                padding: 8px;
-                border-radius: 4px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #2980b9;
-            }
-        """)
+        self.test_btn.setStyleSheet(self._BTN_TEST_QSS)
         self.test_btn.clicked.connect(self.test_connection)
         layout.addWidget(self.test_btn)
         
@@ -90,35 +188,11 @@ class AddNVRDialog(QDialog):
         button_layout = QHBoxLayout()
         
         self.save_btn = QPushButton("💾 Save NVR")
-        self.save_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #27ae60;
-                color: white;
-                border: none;
-                padding: 8px 16px;
-                border-radius: 4px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #229954;
-            }
-        """)
+        self.save_btn.setStyleSheet(self._BTN_SAVE_QSS)
         self.save_btn.clicked.connect(self.accept)
         
         self.cancel_btn = QPushButton("❌ Cancel")
-        self.cancel_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #e74c3c;
-                color: white;
-                border: none;
-                padding: 8px 16px;
-                border-radius: 4px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #c0392b;
-            }
-        """)
+        self.cancel_btn.setStyleSheet(self._BTN_CANCEL_QSS)
         self.cancel_btn.clicked.connect(self.reject)
         
         button_layout.addWidget(self.save_btn)
@@ -137,37 +211,79 @@ class AddNVRDialog(QDialog):
         self.status_label.setText("Testing connection...")
         self.status_label.setStyleSheet("color: #f39c12;")
         
-        # Run test in thread
-        thread = threading.Thread(target=self._test_connection_thread)
-        thread.daemon = True
-        thread.start()
+        # Snapshot the form here; the worker must not touch widgets
+        params = (
+            self.protocol_combo.currentText().lower(),
+            self.ip_edit.text().strip(),
+            self.port_edit.text().strip(),
+            self.username_edit.text().strip(),
+            self.password_edit.text().strip(),
+        )
+        
+        # Run test on the shared pool; the result signal is queued back to the UI thread.
+        # The dialog holds the signals object so it stays alive (and on this thread)
+        # after the pool has finished with (and deleted) the task
+        task = _TestConnectionTask(self._test_connection_thread, *params)
+        self._test_signals = task.signals
+        self._test_signals.done.connect(self._show_test_result)
+        QThreadPool.globalInstance().start(task)
         
-    def _test_connection_thread(self):
-        """Test connection in background thread"""
+    def _test_connection_thread(self, protocol, ip, port, username, password):
+        """Test connection in background thread, returns (success, message)"""
+        # Imported here so opening the dialog does not pay for requests/urllib3
+        from requests.auth import HTTPBasicAuth, HTTPDigestAuth
         try:
-            protocol = self.protocol_combo.currentText().lower()
-            ip = self.ip_edit.text().strip()
-            port = self.port_edit.text().strip()
-            username = self.username_edit.text().strip()
-            password = self.password_edit.text().strip()
+            base_url = f"{protocol}://{ip}:{port}"
+            url = base_url + "/ISAPI/System/deviceInfo"
+            session = self._get_session(base_url)
+            # A cookie from an earlier successful test must not let a retest
+            # with wrong credentials through
+            session.cookies.clear()
             
-            url = f"{protocol}://{ip}:{port}/ISAPI/System/deviceInfo"
-            
-            auth_methods = [HTTPBasicAuth(username, password), HTTPDigestAuth(username, password)]
+            # Hikvision ISAPI almost always requires Digest, so try it first
+            # and only fall back to Basic for devices that reject it. The two
+            # are not raced: that would send the Basic (plain base64) password
+            # on every test and count twice against the NVR's login lockout
+            auth_methods = [HTTPDigestAuth(username, password), HTTPBasicAuth(username, password)]
             
             for auth in auth_methods:
                 try:
-                    response = requests.get(url, auth=auth, timeout=5, verify=False)
+                    # verify=False per call: requests replaces Session.verify with
+                    # REQUESTS_CA_BUNDLE / CURL_CA_BUNDLE when either is set
+                    response = session.get(url, auth=auth, timeout=5, verify=False)
                     if response.status_code == 200:
-                        QTimer.singleShot(0, lambda: self._show_test_result(True, f"✅ Connection successful ({auth.__class__.__name__.replace('HTTP', '').replace('Auth', '')})"))
-                        return
+                        return True, f"✅ Connection successful ({auth.__class__.__name__.replace('HTTP', '').replace('Auth', '')})"
                 except:
                     continue
                     
-            QTimer.singleShot(0, lambda: self._show_test_result(False, "❌ Connection failed - check credentials and network"))
+            return False, "❌ Connection failed - check credentials and network"
             
         except Exception as e:
-            QTimer.singleShot(0, lambda: self._show_test_result(False, f"❌ Error: {str(e)}"))
+            return False, f"❌ Error: {str(e)}"
+            
+    @classmethod
+    def _get_session(cls, key):
+        """Get (or create) the cached session for an NVR host"""
+        with cls._session_lock:
+            session = cls._session_cache.pop(key, None)
+            if session is None:
+                import requests
+                import urllib3
+                from requests.adapters import HTTPAdapter
+                # NVRs serve self-signed certificates; silence the warning urllib3
+                # would otherwise format for every unverified call
+                urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=0)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+            # Re-insert as most recently used; close the least recently used
+            # sessions beyond the limit
+            cls._session_cache[key] = session
+            while len(cls._session_cache) > cls._SESSION_CACHE_SIZE:
+                oldest = next(iter(cls._session_cache))
+                cls._session_cache.pop(oldest).close()
+        return session
             
     def _show_test_result(self, success, message):
         """Show test result in UI thread"""
@@ -180,6 +296,20 @@ class AddNVRDialog(QDialog):
         else:
             self.status_label.setStyleSheet("color: #e74c3c; font-weight: bold;")
             
+    def _live_validate(self):
+        """Highlight invalid IP/port fields without interrupting the user"""
+        ip = self.ip_edit.text().strip()
+        self._set_field_valid(self.ip_edit, not ip or _is_valid_ip(ip))
+        
+        port = self.port_edit.text().strip()
+        self._set_field_valid(self.port_edit, not port or _is_valid_port(port))
+        
+    def _set_field_valid(self, edit, valid):
+        """Toggle the red invalid-input border on a line edit"""
+        style = "" if valid else "border: 1px solid #e74c3c;"
+        if edit.styleSheet() != style:
+            edit.setStyleSheet(style)
+            
     def validate_input(self):
         """Validate form input"""
         if not self.name_edit.text().strip():
@@ -190,17 +320,11 @@ class AddNVRDialog(QDialog):
             QMessageBox.warning(self, "Invalid Input", "Please enter IP address")
             return False
             
-        try:
-            ipaddress.ip_address(self.ip_edit.text().strip())
-        except:
+        if not _is_valid_ip(self.ip_edit.text().strip()):
             QMessageBox.warning(self, "Invalid Input", "Please enter valid IP address")
             return False
             
-        try:
-            port = int(self.port_edit.text().strip())
-            if not (1 <= port <= 65535):
-                raise ValueError
-        except:
+        if not _is_valid_port(self.port_edit.text().strip()):
             QMessageBox.warning(self, "Invalid Input", "Please enter valid port (1-65535)")
             return False
             
@@ -230,12 +354,7 @@ class EditNVRDialog(AddNVRDialog):
     def __init__(self, nvr_data, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Edit NVR Credentials")
-        # Update title label
-        title_widgets = self.findChildren(QLabel)
-        for widget in title_widgets:
-            if "Add New NVR" in widget.text():
-                widget.setText("🔧 Edit NVR Credentials")
-                break
+        self.title_label.setText("🔧 Edit NVR Credentials")
         
         self.nvr_data = nvr_data
         self.populate_fields()
@@ -6,24 +6,125 @@ Handles complete installation, update, and uninstall process
 import os
 import sys
 import json
-import requests
 import subprocess
 import time
 import hashlib
 import shutil
 import zipfile
-import winreg
+import tempfile
+import re
+import functools
+import threading
+import concurrent.futures
 from pathlib import Path
-from PyQt5 import QtCore, QtWidgets, QtGui
+from PyQt5 import QtCore, QtWidgets
+
+# Optional faster integrity hashing for manifests that publish "blake3:<hex>"
+BLAKE3_AVAILABLE = False
+try:
+    import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    pass
 
 VERSION_CONFIG_FILE = "version_config.json"
 UPDATE_CACHE_FILE = "update_cache.json"
-LAST_CHECK_FILE = "last_update_check.json"
+LAST_CHECK_FILE = "last_update_check.json"  # Legacy, migrated into VERSION_CONFIG_FILE
+
+# Built-in settings; version_config.json only needs to hold what differs
+_DEFAULT_CONFIG = {
+    "current_version": "8.0.0",
+    "app_name": "NARONG CCTV TEAM - Camera Monitor",
+    "update_check_url": "https://raw.githubusercontent.com/chhany007/narong-cctv-team/main/version.json",
+    "check_on_startup": True,
+    "auto_download": False,
+    "install_mode": "portable"  # portable or installed
+}
 
 # Installation paths
 PROGRAM_FILES = os.path.join(os.environ.get('PROGRAMFILES', 'C:\\Program Files'), 'NARONG CCTV Team')
 APPDATA = os.path.join(os.environ.get('APPDATA', ''), 'NARONG CCTV Team')
 START_MENU = os.path.join(os.environ.get('APPDATA', ''), 'Microsoft', 'Windows', 'Start Menu', 'Programs')
+_PROGRAM_FILES_LOWER = PROGRAM_FILES.lower()
+
+# Launch updaters detached so they outlive this process (flags exist on Windows only)
+DETACHED_PROCESS_FLAGS = getattr(subprocess, 'DETACHED_PROCESS', 0) | getattr(subprocess, 'CREATE_NEW_PROCESS_GROUP', 0)
+
+# Download settings
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MiB per read/write/hash step
+PROGRESS_INTERVAL = 0.05  # Report progress at most ~20 times per second
+
+# Parallel (multi-part) download settings
+PARALLEL_DOWNLOAD_PARTS = 4
+PARALLEL_DOWNLOAD_MIN_SIZE = 8 * 1024 * 1024  # Smaller files are not worth splitting
+
+@functools.lru_cache(maxsize=32)
+def _parse_version(version):
+    """Parse "8.1.0", "v8.1" or "8.1.0-rc1" into a comparable tuple"""
+    release, sep, _ = version.strip().lstrip('vV').partition('-')
+    parts = [int(x) for x in release.split('.')]
+    # Trailing zeros carry no weight, so "8.1" == "8.1.0" == "8.1.0.0"
+    while parts and parts[-1] == 0:
+        parts.pop()
+    # A pre-release sorts before the final release with the same numbers
+    return tuple(parts), 0 if sep else 1
+
+def _atomic_write_json(path, data):
+    """Write JSON to a temp file and swap it in, so readers never see a torn file"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+# Update manifest field checks, compiled once at import
+# The version ends up in the download file name, so no path characters
+_MANIFEST_VERSION_RE = re.compile(r'^v?\d+(\.\d+){0,3}(-[0-9A-Za-z.]+)?$')
+# Digest length follows the algorithm: bare hex is SHA256. Clients older than
+# this format only understand bare SHA256 hex, so a published manifest with an
+# "algo:" prefix fails verification on them
+_MANIFEST_CHECKSUM_RE = re.compile(r'^((sha256:|blake3:)?[a-f0-9]{64}|(sha512|blake2b):[a-f0-9]{128})?$', re.IGNORECASE)
+_MANIFEST_URL_RE = re.compile(r'^(https?://\S+)?$')
+
+def _validate_manifest(data):
+    """Return a description of the first problem in an update manifest, or None"""
+    if not isinstance(data, dict):
+        return "manifest is not a JSON object"
+    version = data.get("version")
+    if not isinstance(version, str) or not _MANIFEST_VERSION_RE.match(version):
+        return "missing or invalid version"
+    for key in ("download_url", "installer_url"):
+        url = data.get(key, "")
+        if not isinstance(url, str) or not _MANIFEST_URL_RE.match(url):
+            return f"invalid {key}"
+    if not data.get("download_url") and not data.get("installer_url"):
+        return "no download URL"
+    file_size = data.get("file_size", 0)
+    if not isinstance(file_size, int) or isinstance(file_size, bool) or file_size < 0:
+        return "invalid file_size"
+    checksum = data.get("checksum", "")
+    if not isinstance(checksum, str) or not _MANIFEST_CHECKSUM_RE.match(checksum):
+        return "invalid checksum"
+    # blake3 is optional and not part of the frozen build; refuse here rather
+    # than download the whole installer only to fail verification
+    if not BLAKE3_AVAILABLE and _split_checksum(checksum)[0] == 'blake3':
+        return "blake3 checksum requires the blake3 package"
+    for key in ("required", "portable"):
+        if not isinstance(data.get(key, False), bool):
+            return f"invalid {key}"
+    return None
+
+def _split_checksum(checksum):
+    """Split "algo:hex" into (algo, hex); a bare hex digest is SHA256"""
+    algorithm, sep, value = checksum.rpartition(':')
+    return (algorithm.lower() if sep else 'sha256'), value
+
+def _new_hasher(algorithm):
+    """Create a hash object for a manifest checksum algorithm"""
+    if algorithm == 'blake3':
+        if not BLAKE3_AVAILABLE:
+            raise ValueError("blake3 checksum requires the blake3 package")
+        return blake3.blake3(max_threads=blake3.blake3.AUTO)
+    return hashlib.new(algorithm)
 
 class UpdateInfo:
     def __init__(self, data):
@@ -34,36 +135,96 @@ class UpdateInfo:
         self.release_date = data.get("release_date", "")
         self.file_size = data.get("file_size", 0)
         self.checksum = data.get("checksum", "")
+        self.checksum_algorithm, self.checksum_value = _split_checksum(self.checksum)
         self.required = data.get("required", False)
         self.portable = data.get("portable", False)  # Portable vs Installer
 
 class UpdateChecker:
     def __init__(self):
+        self._config_file_keys = set()
         self.config = self.load_config()
+        self._migrate_last_check_file()
+        self.download_dir = tempfile.gettempdir()
+        self._session = None
+        
+        # The executable's location does not change while running, so the
+        # install mode and path are worked out once
+        exe_path = sys.executable if getattr(sys, 'frozen', False) else __file__
+        self._installed_mode = _PROGRAM_FILES_LOWER in exe_path.lower()
+        self._install_path = PROGRAM_FILES if self._installed_mode else os.path.dirname(os.path.abspath(exe_path))
+    
+    @property
+    def session(self):
+        """One pooled session so the manifest check, the HEAD probe and the
+        download (including parallel range parts) reuse connections.
+        
+        Built on first use: requests pulls in urllib3, idna, certifi etc.,
+        which runs that never talk to the update server don't need.
+        """
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            
+            session = requests.Session()
+            # Retry only on transient server statuses, never on connect or read
+            # errors: a timeout is already a long wait, and retrying it would
+            # multiply the caller's timeout (read=False keeps it a ReadTimeout).
+            # Once retries run out the last response is returned for the normal
+            # status handling, and a Retry-After (GitHub sends 60 s on 429) is
+            # not waited out while the modal check dialog is up.
+            adapter = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=8,
+                max_retries=Retry(total=3, connect=0, read=False, status=3, backoff_factor=0.3,
+                                  status_forcelist=[429, 500, 502, 503, 504],
+                                  raise_on_status=False, respect_retry_after_header=False)
+            )
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers['User-Agent'] = f'NARONG-CCTV/{self.get_current_version()}'
+            self._session = session
+        return self._session
         
     def load_config(self):
         """Load version configuration"""
         try:
-            if os.path.exists(VERSION_CONFIG_FILE):
-                with open(VERSION_CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            with open(VERSION_CONFIG_FILE, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            self._config_file_keys = set(config)
+            return dict(_DEFAULT_CONFIG, **config)
+        except FileNotFoundError:
+            pass
         except Exception as e:
             print(f"Error loading config: {e}")
         
-        return {
-            "current_version": "8.0.0",
-            "app_name": "NARONG CCTV TEAM - Camera Monitor",
-            "update_check_url": "https://raw.githubusercontent.com/chhany007/narong-cctv-team/main/version.json",
-            "check_on_startup": True,
-            "auto_download": False,
-            "install_mode": "portable"  # portable or installed
-        }
+        self._config_file_keys = set()
+        return dict(_DEFAULT_CONFIG)
+    
+    def _migrate_last_check_file(self):
+        """Fold the legacy last_update_check.json into the config, once"""
+        try:
+            with open(LAST_CHECK_FILE, 'r') as f:
+                timestamp = json.load(f).get("timestamp", 0)
+            self.config.setdefault("last_update_check", timestamp)
+            self.save_config()
+            os.remove(LAST_CHECK_FILE)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error migrating last check time: {e}")
     
     def save_config(self):
         """Save version configuration"""
+        # Leave untouched defaults out of the file, so a later build can change
+        # a default (e.g. current_version) for users who never set it
+        data = {
+            key: value for key, value in self.config.items()
+            if key in self._config_file_keys or key not in _DEFAULT_CONFIG or _DEFAULT_CONFIG[key] != value
+        }
         try:
-            with open(VERSION_CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=2)
+            _atomic_write_json(VERSION_CONFIG_FILE, data)
+            self._config_file_keys = set(data)
         except Exception as e:
             print(f"Error saving config: {e}")
     
@@ -72,36 +233,19 @@ class UpdateChecker:
         return self.config.get("current_version", "8.0.0")
     
     def is_installed_mode(self):
-        """Check if app is running in installed mode"""
-        # Check if running from Program Files
-        exe_path = sys.executable if getattr(sys, 'frozen', False) else __file__
-        return PROGRAM_FILES.lower() in exe_path.lower()
+        """Check if app is running in installed mode (from Program Files)"""
+        return self._installed_mode
     
     def get_install_path(self):
         """Get installation path"""
-        if self.is_installed_mode():
-            return PROGRAM_FILES
-        else:
-            return os.path.dirname(os.path.abspath(sys.executable if getattr(sys, 'frozen', False) else __file__))
+        return self._install_path
     
     def compare_versions(self, version1, version2):
-        """Compare two version strings"""
+        """Compare two version strings, returns 1, 0 or -1"""
         try:
-            v1_parts = [int(x) for x in version1.split('.')]
-            v2_parts = [int(x) for x in version2.split('.')]
-            
-            while len(v1_parts) < 3:
-                v1_parts.append(0)
-            while len(v2_parts) < 3:
-                v2_parts.append(0)
-            
-            for i in range(3):
-                if v1_parts[i] > v2_parts[i]:
-                    return 1
-                elif v1_parts[i] < v2_parts[i]:
-                    return -1
-            
-            return 0
+            v1 = _parse_version(version1)
+            v2 = _parse_version(version2)
+            return (v1 > v2) - (v1 < v2)
         except Exception:
             return 0
     
@@ -110,38 +254,69 @@ class UpdateChecker:
         if not self.config.get("check_on_startup", True):
             return False
         
-        try:
-            if os.path.exists(LAST_CHECK_FILE):
-                with open(LAST_CHECK_FILE, 'r') as f:
-                    data = json.load(f)
-                    last_check = data.get("timestamp", 0)
-                    if time.time() - last_check < 86400:  # Once per day
-                        return False
-        except Exception:
-            pass
-        
-        return True
+        # Stored in the already-loaded config, so no extra file read here
+        last_check = self.config.get("last_update_check", 0)
+        return time.time() - last_check >= 86400  # Once per day
     
     def save_last_check_time(self):
         """Save the last update check timestamp"""
+        self.config["last_update_check"] = time.time()
+        self.save_config()
+    
+    def load_update_cache(self):
+        """Load the cached update manifest and its HTTP validators"""
+        try:
+            with open(UPDATE_CACHE_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            return {}
+    
+    def save_update_cache(self, cache):
+        """Save the cached update manifest"""
         try:
-            with open(LAST_CHECK_FILE, 'w') as f:
-                json.dump({"timestamp": time.time()}, f)
+            _atomic_write_json(UPDATE_CACHE_FILE, cache)
         except Exception as e:
-            print(f"Error saving last check time: {e}")
+            print(f"Error saving update cache: {e}")
     
     def check_for_updates(self, timeout=10):
         """Check for available updates from remote server"""
+        import requests
+        
         try:
             update_url = self.config.get("update_check_url", "")
             if not update_url:
                 return None, "Update URL not configured"
             
-            response = requests.get(update_url, timeout=timeout)
-            if response.status_code != 200:
+            # Conditional GET: an unchanged manifest comes back as an empty 304
+            cache = self.load_update_cache()
+            headers = {}
+            if cache.get("url") == update_url and cache.get("body"):
+                if cache.get("etag"):
+                    headers['If-None-Match'] = cache["etag"]
+                if cache.get("last_modified"):
+                    headers['If-Modified-Since'] = cache["last_modified"]
+            
+            response = self.session.get(update_url, headers=headers, timeout=timeout)
+            if response.status_code == 304 and headers:
+                update_data = cache["body"]
+            elif response.status_code != 200:
                 return None, f"Server returned status {response.status_code}"
+            else:
+                update_data = response.json()
+                problem = _validate_manifest(update_data)
+                if problem:
+                    return None, f"Malformed update manifest: {problem}"
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+                if etag or last_modified:
+                    self.save_update_cache({
+                        "url": update_url,
+                        "etag": etag,
+                        "last_modified": last_modified,
+                        "body": update_data,
+                        "timestamp": time.time()
+                    })
             
-            update_data = response.json()
             update_info = UpdateInfo(update_data)
             
             current = self.get_current_version()
@@ -168,33 +343,70 @@ class UpdateChecker:
             if not download_url:
                 return None, "No download URL available"
             
-            response = requests.get(download_url, stream=True, timeout=30)
-            response.raise_for_status()
-            
-            total_size = int(response.headers.get('content-length', 0))
-            downloaded = 0
-            
             # Determine file extension
             is_installer = 'installer' in download_url.lower() or update_info.installer_url
             extension = '.exe'
             filename = f"NARONG_CCTV_Update_{update_info.version}{'_Installer' if is_installer else ''}{extension}"
             
             # Save to temp directory
-            temp_dir = os.path.join(os.path.expanduser('~'), 'AppData', 'Local', 'Temp')
-            download_path = os.path.join(temp_dir, filename)
+            download_path = os.path.join(self.download_dir, filename)
             
-            with open(download_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        
-                        if progress_callback and total_size > 0:
-                            progress_callback(int(downloaded * 100 / total_size))
+            # An earlier run (e.g. "Install Later" then restart) may already have
+            # fetched this exact build; a matching checksum skips the download
+            if update_info.checksum and os.path.exists(download_path) \
+                    and self.verify_checksum(download_path, update_info.checksum):
+                if progress_callback:
+                    progress_callback(100)
+                return download_path, None
+            
+            # The streamed path hashes as it writes; parts arrive out of order so
+            # the parallel path leaves digest as None and is hashed from disk
+            digest = None
+            
+            # Split large downloads into concurrent range requests when the server
+            # allows it, unless an interrupted streamed download can be resumed
+            final_url, total_size, accepts_ranges = self.probe_download(download_url)
+            part_path = download_path + '.part'
+            marker_path = part_path + '.json'
+            
+            # A partial file is only resumed if it came from the same build
+            marker = {"checksum": update_info.checksum, "size": total_size}
+            resumable = os.path.exists(part_path)
+            if resumable:
+                try:
+                    with open(marker_path, 'r', encoding='utf-8') as f:
+                        resumable = json.load(f) == marker
+                except Exception:
+                    resumable = False
+                if not resumable:
+                    os.remove(part_path)
+            
+            def download_stream():
+                # The marker describes the .part file the stream writes; it is only
+                # kept while such a partial exists to be resumed
+                _atomic_write_json(marker_path, marker)
+                try:
+                    return self.download_update_stream(download_url, download_path, progress_callback)
+                finally:
+                    if not os.path.exists(part_path):
+                        os.remove(marker_path)
+            
+            if accepts_ranges and total_size >= PARALLEL_DOWNLOAD_MIN_SIZE and not resumable:
+                try:
+                    self.download_update_parallel(final_url, download_path, total_size, progress_callback)
+                except Exception as e:
+                    print(f"Parallel download failed, retrying as a single stream: {e}")
+                    digest = download_stream()
+            else:
+                digest = download_stream()
             
             # Verify checksum if provided
             if update_info.checksum:
-                if not self.verify_checksum(download_path, update_info.checksum):
+                if digest is not None and update_info.checksum_algorithm == 'sha256':
+                    valid = self.checksum_matches(digest, update_info.checksum)
+                else:
+                    valid = self.verify_checksum(download_path, update_info.checksum)
+                if not valid:
                     os.remove(download_path)
                     return None, "Checksum verification failed"
             
@@ -203,18 +415,164 @@ class UpdateChecker:
         except Exception as e:
             return None, f"Download failed: {str(e)}"
     
-    def verify_checksum(self, filepath, expected_checksum):
-        """Verify file checksum (SHA256)"""
+    def probe_download(self, url):
+        """Resolve redirects and check size/range support with a HEAD request.
+        Returns (final_url, total_size, accepts_ranges).
+        """
         try:
+            response = self.session.head(url, allow_redirects=True, timeout=10)
+            if response.status_code != 200:
+                return url, 0, False
+            total_size = int(response.headers.get('content-length', 0))
+            accepts_ranges = response.headers.get('accept-ranges', '').lower() == 'bytes'
+            return response.url, total_size, accepts_ranges
+        except Exception:
+            return url, 0, False
+    
+    def download_update_stream(self, url, download_path, progress_callback=None):
+        """Download a file over a single streamed connection.
+        Data goes to <download_path>.part first, so an interrupted download is
+        resumed with a Range request on the next attempt.
+        Returns the SHA256 hex digest, computed while the data is written.
+        Other manifest algorithms are verified from disk by verify_checksum.
+        """
+        part_path = download_path + '.part'
+        resume_from = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {'Range': f'bytes={resume_from}-'} if resume_from else {}
+        
+        response = self.session.get(url, headers=headers, stream=True, timeout=30)
+        if response.status_code == 416:
+            # The partial file does not fit what the server has; start over
+            response.close()
+            os.remove(part_path)
+            return self.download_update_stream(url, download_path, progress_callback)
+        response.raise_for_status()
+        
+        if response.status_code == 206:
+            # Continue the hash over the bytes already on disk
+            downloaded = resume_from
+            with open(part_path, 'rb') as f:
+                sha256_hash = self._hash_file(f)
+            mode = 'ab'
+        else:
+            # No partial file, or the server ignored the range; start from byte 0
+            downloaded = 0
             sha256_hash = hashlib.sha256()
+            mode = 'wb'
+        
+        content_length = int(response.headers.get('content-length', 0))
+        total_size = downloaded + content_length if content_length else 0
+        last_report = 0.0
+        
+        with open(part_path, mode) as f:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                if chunk:
+                    f.write(chunk)
+                    sha256_hash.update(chunk)
+                    downloaded += len(chunk)
+                    
+                    if progress_callback and total_size > 0:
+                        now = time.monotonic()
+                        if now - last_report >= PROGRESS_INTERVAL or downloaded >= total_size:
+                            progress_callback(int(downloaded * 100 / total_size))
+                            last_report = now
+        
+        # Keep a short body as .part so the next attempt resumes it
+        if total_size and downloaded < total_size:
+            raise IOError(f"Connection closed at {downloaded} of {total_size} bytes")
+        
+        os.replace(part_path, download_path)
+        return sha256_hash.hexdigest()
+    
+    def download_update_parallel(self, url, download_path, total_size, progress_callback=None,
+                                 parts=PARALLEL_DOWNLOAD_PARTS):
+        """Download a file as concurrent HTTP Range requests into a pre-sized file"""
+        # Parts are written to <download_path>.part, which only takes the real
+        # name once every byte has arrived
+        part_path = download_path + '.part'
+        
+        # Pre-size the file so every part can write at its own offset
+        with open(part_path, 'wb') as f:
+            f.truncate(total_size)
+        
+        part_size = -(-total_size // parts)  # Ceiling division
+        ranges = [(start, min(start + part_size, total_size))
+                  for start in range(0, total_size, part_size)]
+        
+        lock = threading.Lock()
+        abort = threading.Event()
+        state = {"downloaded": 0}
+        
+        # The parts share the pooled session across threads: its connection pool
+        # is thread-safe and sized for PARALLEL_DOWNLOAD_PARTS connections
+        def fetch_range(start, end):
+            headers = {'Range': f'bytes={start}-{end - 1}'}
+            with self.session.get(url, headers=headers, stream=True, timeout=30) as response:
+                if response.status_code != 206:
+                    raise IOError(f"Server ignored range request (status {response.status_code})")
+                with open(part_path, 'r+b') as f:
+                    f.seek(start)
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        if abort.is_set():
+                            return
+                        if chunk:
+                            f.write(chunk)
+                            with lock:
+                                state["downloaded"] += len(chunk)
+        
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+                futures = [executor.submit(fetch_range, start, end) for start, end in ranges]
+                pending = set(futures)
+                last_percent = -1
+                # Report progress from this thread while the parts run
+                while pending:
+                    done, pending = concurrent.futures.wait(pending, timeout=0.1)
+                    for future in done:
+                        if future.exception() is not None:
+                            abort.set()
+                            raise future.exception()
+                    percent = int(state["downloaded"] * 100 / total_size)
+                    if progress_callback and percent != last_percent:
+                        progress_callback(percent)
+                        last_percent = percent
+            
+            if state["downloaded"] != total_size:
+                raise IOError(f"Incomplete download ({state['downloaded']} of {total_size} bytes)")
+        except BaseException:
+            # A zero-padded file with gaps cannot be resumed; drop it
+            os.remove(part_path)
+            raise
+        
+        os.replace(part_path, download_path)
+    
+    def checksum_matches(self, digest, expected_checksum):
+        """Compare an already computed hex digest with the expected checksum"""
+        return digest.lower() == _split_checksum(expected_checksum)[1].lower()
+    
+    def verify_checksum(self, filepath, expected_checksum):
+        """Verify file checksum ("algo:hex", or bare hex for SHA256)"""
+        try:
+            algorithm, expected = _split_checksum(expected_checksum)
             with open(filepath, "rb") as f:
-                for byte_block in iter(lambda: f.read(4096), b""):
-                    sha256_hash.update(byte_block)
+                file_hash = self._hash_file(f, algorithm)
             
-            return sha256_hash.hexdigest().lower() == expected_checksum.lower()
+            return file_hash.hexdigest().lower() == expected.lower()
         except Exception:
             return False
     
+    def _hash_file(self, f, algorithm='sha256'):
+        """Hash the rest of an open binary file, returns the hash object"""
+        # Ask the OS for aggressive read-ahead where supported (not on Windows)
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        # 1 MiB blocks keep the per-block Python overhead negligible, and
+        # hashlib releases the GIL while it hashes each block
+        file_hash = _new_hasher(algorithm)
+        for byte_block in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+            file_hash.update(byte_block)
+        return file_hash
+    
     def install_update(self, installer_path):
         """Install or apply update depending on mode and file type.
         - Installed mode: launch installer with silent update flags.
@@ -222,7 +580,12 @@ class UpdateChecker:
         """
         try:
             if self.is_installed_mode():
-                subprocess.Popen([installer_path, '/SILENT', '/UPDATE'], shell=True)
+                # The installer writes to Program Files, so start it elevated;
+                # a plain CreateProcess would fail with "elevation required"
+                import ctypes
+                result = ctypes.windll.shell32.ShellExecuteW(None, 'runas', installer_path, '/SILENT /UPDATE', None, 1)
+                if result <= 32:
+                    return False, f"Could not start installer (error {result})"
                 return True, None
             # Portable mode
             install_path = self.get_install_path()
@@ -247,17 +610,19 @@ class UpdateChecker:
                                         os.chmod(dst_f, 0o666)
                                 except Exception:
                                     pass
-                                shutil.copy2(src_f, dst_f)
+                                try:
+                                    # Same volume: a rename, no file data is copied
+                                    os.replace(src_f, dst_f)
+                                except OSError:
+                                    # Temp dir on another drive than the install path
+                                    shutil.copy2(src_f, dst_f)
                         shutil.rmtree(temp_extract, ignore_errors=True)
                     # Update current_version if available in package
                     try:
-                        cfg = self.load_config()
                         # Best effort: derive version from filename
-                        import re
                         m = re.search(r"Update_(\d+\.\d+(?:\.\d+)?)", os.path.basename(installer_path))
                         if m:
-                            cfg['current_version'] = m.group(1)
-                            self.config = cfg
+                            self.config['current_version'] = m.group(1)
                             self.save_config()
                     except Exception:
                         pass
@@ -266,7 +631,7 @@ class UpdateChecker:
                     return False, f"Portable update failed: {e}"
             else:
                 # Fallback: just run the downloaded updater (exe)
-                subprocess.Popen([installer_path], shell=True)
+                subprocess.Popen([installer_path], creationflags=DETACHED_PROCESS_FLAGS)
                 return True, None
         except Exception as e:
             return False, f"Failed to apply update: {str(e)}"
@@ -274,17 +639,26 @@ class UpdateChecker:
     def create_uninstaller(self):
         """Create uninstaller entry in Windows"""
         try:
+            import winreg
+            
             if not self.is_installed_mode():
                 return False, "Only available in installed mode"
             
             key_path = r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall\NARONG_CCTV_Team"
             
-            with winreg.CreateKey(winreg.HKEY_LOCAL_MACHINE, key_path) as key:
-                winreg.SetValueEx(key, "DisplayName", 0, winreg.REG_SZ, "NARONG CCTV TEAM - Camera Monitor")
-                winreg.SetValueEx(key, "DisplayVersion", 0, winreg.REG_SZ, self.get_current_version())
-                winreg.SetValueEx(key, "Publisher", 0, winreg.REG_SZ, "NARONG CCTV TEAM")
-                winreg.SetValueEx(key, "UninstallString", 0, winreg.REG_SZ, f'"{PROGRAM_FILES}\\uninstall.exe"')
-                winreg.SetValueEx(key, "InstallLocation", 0, winreg.REG_SZ, PROGRAM_FILES)
+            values = [
+                ("DisplayName", winreg.REG_SZ, "NARONG CCTV TEAM - Camera Monitor"),
+                ("DisplayVersion", winreg.REG_SZ, self.get_current_version()),
+                ("Publisher", winreg.REG_SZ, "NARONG CCTV TEAM"),
+                ("UninstallString", winreg.REG_SZ, f'"{PROGRAM_FILES}\\uninstall.exe"'),
+                ("InstallLocation", winreg.REG_SZ, PROGRAM_FILES),
+            ]
+            
+            # Write-only access to the 64-bit view
+            access = winreg.KEY_WRITE | winreg.KEY_WOW64_64KEY
+            with winreg.CreateKeyEx(winreg.HKEY_LOCAL_MACHINE, key_path, 0, access) as key:
+                for name, value_type, value in values:
+                    winreg.SetValueEx(key, name, 0, value_type, value)
                 
             return True, None
         except Exception as e:
@@ -294,19 +668,35 @@ class UpdateChecker:
 class UpdateDialog(QtWidgets.QDialog):
     """Enhanced update dialog with installer support"""
     
-    def __init__(self, update_info, parent=None):
+    # (window icon, header pixmap), rendered on first use
+    _icons = None
+    
+    def __init__(self, update_info, parent=None, update_checker=None):
         super().__init__(parent)
         self.update_info = update_info
         self.installer_path = None
-        self.update_checker = UpdateChecker()
+        # Reuse the checker that found the update, so the download shares its
+        # loaded config and keep-alive session
+        self.update_checker = update_checker if update_checker is not None else UpdateChecker()
         
         self.setWindowTitle("Update Available")
-        self.setWindowIcon(self.style().standardIcon(QtWidgets.QStyle.SP_BrowserReload))
+        self.setWindowIcon(self._get_icons()[0])
         self.setMinimumWidth(550)
         self.setMinimumHeight(450)
         
         self.setup_ui()
     
+    @classmethod
+    def _get_icons(cls):
+        """Look up and rasterize the standard icons once per process"""
+        if cls._icons is None:
+            style = QtWidgets.QApplication.style()
+            cls._icons = (
+                style.standardIcon(QtWidgets.QStyle.SP_BrowserReload),
+                style.standardIcon(QtWidgets.QStyle.SP_MessageBoxInformation).pixmap(48, 48)
+            )
+        return cls._icons
+    
     def setup_ui(self):
         layout = QtWidgets.QVBoxLayout(self)
         layout.setSpacing(15)
@@ -314,7 +704,7 @@ class UpdateDialog(QtWidgets.QDialog):
         # Header
         header_layout = QtWidgets.QHBoxLayout()
         icon_label = QtWidgets.QLabel()
-        icon_label.setPixmap(self.style().standardIcon(QtWidgets.QStyle.SP_MessageBoxInformation).pixmap(48, 48))
+        icon_label.setPixmap(self._get_icons()[1])
         header_layout.addWidget(icon_label)
         
         header_text = QtWidgets.QLabel(f"<h2>🎉 Update Available!</h2>")
@@ -394,10 +784,13 @@ class UpdateDialog(QtWidgets.QDialog):
         self.status_label.setVisible(True)
         self.status_label.setText("Preparing download...")
         
-        self.download_thread = DownloadThread(self.update_info, self.update_checker)
-        self.download_thread.progress.connect(self.update_progress)
-        self.download_thread.finished_signal.connect(self.download_finished)
-        self.download_thread.start()
+        # The dialog holds the signals object so queued results still arrive
+        # after the pool has finished with (and deleted) the task
+        task = _DownloadTask(self.update_info, self.update_checker)
+        self.download_signals = task.signals
+        self.download_signals.progress.connect(self.update_progress)
+        self.download_signals.finished.connect(self.download_finished)
+        QtCore.QThreadPool.globalInstance().start(task)
     
     def update_progress(self, percent):
         """Update download progress"""
@@ -446,32 +839,37 @@ class UpdateDialog(QtWidgets.QDialog):
     
     def skip_version(self):
         """Skip this version"""
-        try:
-            config = self.update_checker.load_config()
-            config['skipped_version'] = self.update_info.version
-            with open(VERSION_CONFIG_FILE, 'w') as f:
-                json.dump(config, f, indent=2)
-        except Exception:
-            pass
+        self.update_checker.config['skipped_version'] = self.update_info.version
+        self.update_checker.save_config()
         
         self.reject()
 
 
-class DownloadThread(QtCore.QThread):
-    """Background thread for downloading updates"""
-    
+class _DownloadSignals(QtCore.QObject):
+    """Signals for _DownloadTask (QRunnable is not a QObject)"""
     progress = QtCore.pyqtSignal(int)
-    finished_signal = QtCore.pyqtSignal(bool, str, str)
+    finished = QtCore.pyqtSignal(bool, str, str)
+
+
+class _DownloadTask(QtCore.QRunnable):
+    """Downloads an update on the global thread pool"""
     
     def __init__(self, update_info, update_checker):
         super().__init__()
         self.update_info = update_info
         self.update_checker = update_checker
+        self.signals = _DownloadSignals()
     
     def run(self):
         """Download the update"""
+        last_percent = -1
+        
         def progress_callback(percent):
-            self.progress.emit(percent)
+            nonlocal last_percent
+            # Each emit wakes the GUI thread; skip ones that would not move the bar
+            if percent != last_percent:
+                last_percent = percent
+                self.signals.progress.emit(percent)
         
         installer_path, error = self.update_checker.download_update(
             self.update_info, 
@@ -479,9 +877,32 @@ class DownloadThread(QtCore.QThread):
         )
         
         if installer_path:
-            self.finished_signal.emit(True, installer_path, "")
+            self.signals.finished.emit(True, installer_path, "")
         else:
-            self.finished_signal.emit(False, "", error)
+            self.signals.finished.emit(False, "", error)
+
+
+class _CheckSignals(QtCore.QObject):
+    """Signals for _CheckTask (QRunnable is not a QObject)"""
+    result = QtCore.pyqtSignal(object, str)
+
+
+class _CheckTask(QtCore.QRunnable):
+    """Checks the update server on the global thread pool"""
+    
+    def __init__(self, checker):
+        super().__init__()
+        self.checker = checker
+        self.signals = _CheckSignals()
+    
+    def run(self):
+        update_info, error = self.checker.check_for_updates()
+        self.signals.result.emit(update_info, error)
+
+
+# Signal objects of update checks started without a parent widget, kept
+# alive here until their queued result has been delivered
+_pending_update_checks = []
 
 
 def check_for_updates_async(parent_widget=None, show_no_update=False):
@@ -503,27 +924,15 @@ def check_for_updates_async(parent_widget=None, show_no_update=False):
     progress.setCancelButton(None)
     progress.show()
     
-    class CheckThread(QtCore.QThread):
-        result = QtCore.pyqtSignal(object, str)
-        
-        def __init__(self, checker):
-            super().__init__()
-            self.checker = checker
-        
-        def run(self):
-            update_info, error = self.checker.check_for_updates()
-            self.result.emit(update_info, error)
-    
     def on_check_complete(update_info, error):
         progress.close()
         
         if update_info:
-            config = checker.load_config()
-            if config.get('skipped_version') == update_info.version:
+            if checker.config.get('skipped_version') == update_info.version:
                 if not show_no_update:
                     return
             
-            dialog = UpdateDialog(update_info, parent_widget)
+            dialog = UpdateDialog(update_info, parent_widget, checker)
             dialog.exec_()
         else:
             if show_no_update:
@@ -540,30 +949,27 @@ def check_for_updates_async(parent_widget=None, show_no_update=False):
                         "You are already using the latest version!"
                     )
     
-    check_thread = CheckThread(checker)
-    check_thread.result.connect(on_check_complete)
-
-    # Ensure thread is not garbage-collected before finishing
-    # Attach to parent widget (or module-level list) and clean up on finish.
-    storage_target = parent_widget if parent_widget is not None else checker
-    attr_name = '_active_update_threads'
-    existing = getattr(storage_target, attr_name, None)
-    if existing is None:
-        setattr(storage_target, attr_name, [])
-        existing = getattr(storage_target, attr_name)
-    existing.append(check_thread)
-
-    def _cleanup_thread():
+    task = _CheckTask(checker)
+    signals = task.signals
+    
+    # Ensure the signals object is not garbage-collected before its result
+    # is delivered: attach to the parent widget (or the module-level list)
+    # and release it once the result has been handled.
+    if parent_widget is not None:
+        pending = getattr(parent_widget, '_active_update_threads', None)
+        if pending is None:
+            pending = parent_widget._active_update_threads = []
+    else:
+        pending = _pending_update_checks
+    pending.append(signals)
+    
+    def _release_signals(*_):
         try:
-            lst = getattr(storage_target, attr_name, [])
-            if check_thread in lst:
-                lst.remove(check_thread)
-        except Exception:
+            pending.remove(signals)
+        except ValueError:
             pass
-        check_thread.deleteLater()
-
-    check_thread.finished.connect(_cleanup_thread)
-    # Give the thread a parent (if possible) so Qt manages lifetime safely
-    if parent_widget is not None:
-        check_thread.setParent(parent_widget)
-    check_thread.start()
+        signals.deleteLater()
+    
+    signals.result.connect(on_check_complete)
+    signals.result.connect(_release_signals)
+    QtCore.QThreadPool.globalInstance().start(task)